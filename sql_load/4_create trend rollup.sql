@@ -0,0 +1,88 @@
+/*
+Daily skill-demand rollup used by the "Demand Trends" dashboard page.
+
+- One row per (day, job category, remote flag, country, skill) with posting counts and salary sums,
+  so trend charts read pre-aggregated rows instead of joining and date_trunc-ing the whole fact table.
+- Rolled up per day rather than per week: weeks straddle month boundaries, so only day buckets can be
+  re-grouped into both weeks and calendar months without crediting postings to the wrong month.
+- Salary is stored as SUM + COUNT (not AVG) so days can be re-bucketed into weeks, months or any date
+  window and the averages stay exact.
+- A BRIN index on job_posted_date keeps raw date-range scans cheap: postings are loaded roughly in date
+  order, so block ranges map cleanly onto time ranges and the index stays tiny as years of data pile up.
+
+Run this once after 3_insert data.sql, then call refresh_skill_demand_daily() whenever new postings are loaded.
+*/
+
+-- BRIN index for date-range scans on the raw fact table
+CREATE INDEX IF NOT EXISTS idx_job_posted_date_brin
+    ON public.job_postings_fact USING BRIN (job_posted_date) WITH (pages_per_range = 32);
+
+-- Replace the earlier weekly rollup, whose weeks couldn't be split into calendar months
+DROP FUNCTION IF EXISTS public.refresh_skill_demand_weekly(DATE);
+DROP TABLE IF EXISTS public.skill_demand_weekly;
+
+-- Create the daily rollup table
+CREATE TABLE IF NOT EXISTS public.skill_demand_daily
+(
+    day DATE NOT NULL,
+    job_title_short VARCHAR(255),
+    job_work_from_home BOOLEAN,
+    job_country TEXT,
+    skill_id INT NOT NULL,
+    postings INT NOT NULL,
+    salary_year_count INT NOT NULL,
+    salary_year_sum NUMERIC,
+    salary_hour_count INT NOT NULL,
+    salary_hour_sum NUMERIC,
+    FOREIGN KEY (skill_id) REFERENCES public.skills_dim (skill_id)
+);
+
+ALTER TABLE public.skill_demand_daily OWNER to postgres;
+
+-- Trend queries always filter on a date range, usually for a handful of skills
+CREATE INDEX IF NOT EXISTS idx_skill_demand_daily_day_skill
+    ON public.skill_demand_daily (day, skill_id);
+
+/*
+Rebuild every day from `from_day` onwards (defaults to a full rebuild).
+Only the affected tail is deleted and re-aggregated, and the fact-table read is a BRIN range scan,
+so a daily load only touches the last few days of data.
+*/
+CREATE OR REPLACE FUNCTION public.refresh_skill_demand_daily(from_day DATE DEFAULT '-infinity')
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted INT;
+BEGIN
+    DELETE FROM public.skill_demand_daily
+    WHERE day >= from_day;
+
+    INSERT INTO public.skill_demand_daily
+    SELECT
+        jobs.job_posted_date::DATE AS day,
+        jobs.job_title_short,
+        jobs.job_work_from_home,
+        jobs.job_country,
+        skill_to_job.skill_id,
+        COUNT(*) AS postings,
+        COUNT(jobs.salary_year_avg) AS salary_year_count,
+        SUM(jobs.salary_year_avg) AS salary_year_sum,
+        COUNT(jobs.salary_hour_avg) AS salary_hour_count,
+        SUM(jobs.salary_hour_avg) AS salary_hour_sum
+    FROM public.job_postings_fact AS jobs
+    INNER JOIN public.skills_job_dim AS skill_to_job ON jobs.job_id = skill_to_job.job_id
+    WHERE jobs.job_posted_date >= from_day
+    GROUP BY 1, 2, 3, 4, 5;
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    ANALYZE public.skill_demand_daily;
+    RETURN inserted;
+END;
+$$;
+
+-- Initial full build
+SELECT public.refresh_skill_demand_daily();
+
+-- Incremental refresh after loading new postings, e.g. re-aggregate the last two weeks:
+-- SELECT public.refresh_skill_demand_daily((CURRENT_DATE - INTERVAL '14 days')::DATE);
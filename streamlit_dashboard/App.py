@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from db_conn import get_connection
+from db_conn import get_connection, query_key, run_query, QUERY_DEADLINE_S, MAX_CONCURRENT_QUERIES
+from governor import QueryGovernor
+from leaderboard import CompanyLeaderboard
+import queries as q
 
 # STREAMLIT CONFIGURATION
 st.set_page_config(
@@ -91,25 +94,40 @@ h1, h2, h3 {
 def init_connection():
     return get_connection()
 
-@st.cache_data(ttl=600)
-def load_data(query):
-    """ Helper function to execute SQL query and return a DataFrame"""
+@st.cache_resource
+def init_governor():
+    return QueryGovernor(max_concurrent=MAX_CONCURRENT_QUERIES, deadline=QUERY_DEADLINE_S)
+
+def fetch_uncached(query, schema=None):
+    engine = init_connection().engine
+    return init_governor().run(query_key(query, schema), lambda timeout_ms: run_query(engine, query, timeout_ms, schema))
+
+# Failures raise, so st.cache_data never caches an error or a stale fallback
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_data(query, schema=None):
+    return fetch_uncached(query, schema)
+
+@st.cache_resource
+def init_leaderboard():
+    return CompanyLeaderboard()
+
+def load_data(query, schema=None):
+    """ Helper function to execute SQL query and return a DataFrame with the template's dtypes (queries.py *_SCHEMA)"""
     try:
-        conn = init_connection()
-        df = conn.query(query)
-        return df
+        return fetch_data(query, schema)
     except Exception as e:
+        # Fall back to the last result we got for this query rather than an empty chart
+        stale_df = init_governor().last_good(query_key(query, schema))
+        if stale_df is not None:
+            st.caption("🕒 **Stale** — the database is slow or unavailable, showing the last loaded result.")
+            return stale_df.copy()
         st.error(f"Database Error: {e}")
         return pd.DataFrame()
 
 # dynamic country fetching from db
 @st.cache_data
 def load_countries():
-    df = load_data("""
-        SELECT DISTINCT job_country
-        FROM job_postings_fact
-        WHERE job_country <> 'Israel' AND job_country IS NOT NULL
-        ORDER BY job_country ASC """)
+    df = load_data(q.COUNTRIES_SQL)
     return df['job_country'].tolist() if not df.empty else []
 
 COUNTRY_LIST = load_countries()
@@ -120,26 +138,19 @@ st.sidebar.title("🔍 Discovery Filters")
 
 page = st.sidebar.selectbox(
     "**Navigate To**",
-    ["📑 Project Overview", "📊 Market Overview", "💰 Salary Insights", "🛠️ Skill Economics", "🏢 Top Hiring Companies"])
+    ["📑 Project Overview", "📊 Market Overview", "💰 Salary Insights", "🛠️ Skill Economics", "🏢 Top Hiring Companies", "📈 Demand Trends"])
 
 job_filter = st.sidebar.selectbox(
     "**Select Job Category**",
-    ["All", "Data Analyst", "Data Scientist", "Data Engineer", "Business Analyst",
-     "Machine Learning Engineer", "Senior Data Analyst", "Senior Data Engineer",
-     "Senior Data Scientist", "Software Engineer", "Cloud Engineer"],
+    q.JOB_CATEGORIES,
     index=0)
 
 location_filter = st.sidebar.radio(
-    "**Location Type**", ["Global", "Remote Only"])
+    "**Location Type**", q.LOCATION_TYPES)
 
 st.sidebar.markdown("<div style='margin-top:-30px;'></div>", unsafe_allow_html=True)
 
-# Dynamic SQL Where Clause
-where_clause = "WHERE 1=1"
-if job_filter != "All":
-    where_clause += f" AND job_title_short = '{job_filter}'"
-if location_filter == "Remote Only":
-    where_clause += " AND job_work_from_home IS TRUE"
+# Each page builds its SQL Where Clause from these filters plus its own country selector (q.build_where)
     
 # PAGE 1: Project Overview 
 if page == "📑 Project Overview":
@@ -276,21 +287,13 @@ elif page == "📊 Market Overview":
         
     with col_filter:
         st.markdown("<div style='font-size:18px; margin-bottom:-12px; margin-top:0px;'>🌍 Select Country</div>", unsafe_allow_html=True)
-        market_country = st.selectbox("", ["Select All"] + COUNTRY_LIST, key="market_country")
+        market_country = st.selectbox("", [q.ALL_COUNTRIES] + COUNTRY_LIST, key="market_country")
         
-    market_where = where_clause
-    if market_country != "Select All":
-        market_where += f" AND job_country = '{market_country}'"
+    market_where = q.build_where(job_filter, location_filter, market_country)
     
     # Card Visuals 
-    kpi_query = f"""
-        SELECT 
-            COUNT(job_id) as total, 
-            ROUND(AVG(salary_year_avg), 0) as sal,
-            ROUND(SUM(CASE WHEN job_work_from_home IS TRUE THEN 1 ELSE 0 END) * 100.0 / COUNT(job_id), 1) as remote_pct
-        FROM job_postings_fact
-        {market_where} """
-    kpi_data = load_data(kpi_query)
+    kpi_query = q.kpi_sql(market_where)
+    kpi_data = load_data(kpi_query, q.KPI_SCHEMA)
     
     # Safe handling of potential NULL values in KPIs
     if not kpi_data.empty:
@@ -308,19 +311,9 @@ elif page == "📊 Market Overview":
 
     # Bar Chat: Top 10 Demanded Skills
     st.subheader("🏆 Top 10 Demanded Skills")
-    skills_sql = f"""
-        SELECT
-            skills,
-            COUNT(skill_to_job.job_id) AS total_jobs
-        FROM job_postings_fact AS jobs
-        INNER JOIN skills_job_dim AS skill_to_job ON jobs.job_id = skill_to_job.job_id
-        INNER JOIN skills_dim AS skills ON skill_to_job.skill_id = skills.skill_id
-        {market_where}
-        GROUP BY skills
-        ORDER BY total_jobs DESC
-        LIMIT 10 """
+    skills_sql = q.top_skills_sql(market_where)
                 
-    df_skills = load_data(skills_sql)
+    df_skills = load_data(skills_sql, q.TOP_SKILLS_SCHEMA)
     if not df_skills.empty:
         df_skills['skills'] = df_skills['skills'].str.title()
         df_skills['label'] = (df_skills['total_jobs'] / 1000).map('{:,.1f}K'.format)
@@ -364,19 +357,9 @@ elif page == "📊 Market Overview":
     label_text = "Avg Yearly Salary ($)" if salary_type == "Yearly" else "Avg Hourly Salary ($)"
     tick_format = "$~s" if salary_type == "Yearly" else "$0"
 
-    scatter_sql = f"""
-        SELECT
-            job_title_short,
-            ROUND(AVG({col_to_use}), 0) AS {col_to_use},
-            (SELECT ROUND(AVG({col_to_use}), 0) FROM job_postings_fact 
-                 {market_where} AND {col_to_use} IS NOT NULL) AS market_avg
-        FROM job_postings_fact
-        {market_where} AND {col_to_use} IS NOT NULL
-        GROUP BY job_title_short
-        ORDER BY {col_to_use} DESC
-        LIMIT 10"""
-
-    df_scatter = load_data(scatter_sql)
+    scatter_sql = q.role_benchmark_sql(market_where, col_to_use)
+
+    df_scatter = load_data(scatter_sql, q.ROLE_BENCHMARK_SCHEMA)
     
     if not df_scatter.empty:
         emerald_scale = [[0.0, '#064e3b'], [0.5, '#10b981'], [1.0, '#34d399']]
@@ -422,58 +405,23 @@ elif page == "💰 Salary Insights":
     
     with col_filter:
         st.markdown("<div style='font-size:18px; margin-bottom:-12px; margin-top:0px;'>🌍 Select Country</div>", unsafe_allow_html=True)
-        country_filter = st.selectbox("", ["Select All"] + COUNTRY_LIST, key="salary_country")
+        country_filter = st.selectbox("", [q.ALL_COUNTRIES] + COUNTRY_LIST, key="salary_country")
         
     st.subheader("🛠️ Highest-Paying Skills – 2023")
     st.markdown('<h6 class="tight-header">Skills Categories :</h5>', unsafe_allow_html=True)
     
     # Skill Type Filter
     skill_type_ui = st.radio("", 
-        ["All", "Languages", "Tools", "Databases", "Cloud", "Libraries", "Frameworks"], 
+        list(q.SKILL_TYPES), 
         horizontal=True, key="salary_skill_type" )
     
-    # Mapping UI labels to original database values
-    skill_mapping = {
-        "All": "All",
-        "Languages": "programming",
-        "Tools": "analyst_tools",
-        "Databases": "Databases",
-        "Cloud": "Cloud",
-        "Libraries": "Libraries",
-        "Frameworks": "webframeworks" }
-    selected_db_val = skill_mapping[skill_type_ui]
-    
-    # Dynamic Salary Where Clause
-    salary_where = where_clause
-    if country_filter != "Select All":
-        salary_where += f" AND job_country = '{country_filter}'"
-
-    if selected_db_val != "All":
-        salary_where += f" AND LOWER(skills.type) = '{selected_db_val.lower()}'"
-        
-    # Dynamic Role Where Clause for Role Salary Chart
-    role_where = where_clause
-    if country_filter != "Select All":
-        role_where += f" AND job_country = '{country_filter}'"
+    # Dynamic Salary Where Clause (skill type is applied inside q.top_paying_skills_sql)
+    salary_where = q.build_where(job_filter, location_filter, country_filter)
     
      # 10 Highest Paying Skills Query
-    salary_skills_sql = f"""
-    WITH ranking AS (
-        SELECT
-            skills.skills,
-            ROUND(AVG(salary_year_avg), 0) AS avg_salary,
-            DENSE_RANK() OVER (ORDER BY AVG(salary_year_avg) DESC) AS rnk
-        FROM job_postings_fact AS jobs
-        INNER JOIN skills_job_dim ON jobs.job_id = skills_job_dim.job_id
-        INNER JOIN skills_dim AS skills ON skills_job_dim.skill_id = skills.skill_id
-        {salary_where} AND salary_year_avg IS NOT NULL
-        GROUP BY skills.skills
-    )
-    SELECT * FROM ranking
-    WHERE rnk <= 10 
-    ORDER BY avg_salary DESC; """
+    salary_skills_sql = q.top_paying_skills_sql(salary_where, skill_type_ui)
     
-    df_salary_skills = load_data(salary_skills_sql)
+    df_salary_skills = load_data(salary_skills_sql, q.TOP_PAYING_SKILLS_SCHEMA)
     if not df_salary_skills.empty:
         df_salary_skills['skills'] = df_salary_skills['skills'].str.title()
         
@@ -527,20 +475,10 @@ elif page == "💰 Salary Insights":
     label_text = "Avg Yearly Salary ($)" if salary_type == "Yearly" else "Avg Hourly Salary"
     tick_format = "$~s" if salary_type == "Yearly" else "$0"
 
-    salary_where_sql = role_where
-
     # Query for top 10 highest average salaries by role
-    role_salary_sql = f"""
-        SELECT 
-            job_title_short AS role,
-            ROUND(AVG({col_to_use}), 0) AS avg_salary
-        FROM job_postings_fact
-        {salary_where_sql} AND {col_to_use} IS NOT NULL
-        GROUP BY job_title_short
-        ORDER BY avg_salary DESC
-        LIMIT 10 """
-
-    df_role_salary = load_data(role_salary_sql)
+    role_salary_sql = q.role_salary_sql(salary_where, col_to_use)
+
+    df_role_salary = load_data(role_salary_sql, q.ROLE_SALARY_SCHEMA)
 
     if not df_role_salary.empty:
         df_role_salary = df_role_salary.sort_values(by='avg_salary', ascending=True)
@@ -588,49 +526,16 @@ elif page == "🛠️ Skill Economics":
 
     with col_filter:
         st.markdown("<div style='font-size:18px; margin-bottom:-12px; margin-top:0px;'>🌍 Select Country</div>", unsafe_allow_html=True)
-        skill_country = st.selectbox("", ["Select All"] + COUNTRY_LIST, key="skill_country")
+        skill_country = st.selectbox("", [q.ALL_COUNTRIES] + COUNTRY_LIST, key="skill_country")
 
-    skill_where = where_clause
-    if skill_country != "Select All":
-        skill_where += f" AND job_country = '{skill_country}'"
+    skill_where = q.build_where(job_filter, location_filter, skill_country)
 
     st.subheader("💎 Most Optimal Skills — Demand vs Salary 🧠")
     st.markdown("<p style='color:#ffdb58; font-size:15px; margin-top:-10px;'>💡 <b>Tip:</b> Use the <b>green slider</b> at the bottom to slide across the x-axis. Click the <b>pan (↔) button</b> in the toolbar, then drag the chart to set your view. Use the <b>full screen</b> icon to expand, and <b>reset axes</b> to return to the default view.</p>", unsafe_allow_html=True)
     
-    scatter_sql = f"""
-    WITH skill_demand AS (
-        SELECT
-            skill_to_job.skill_id,
-            skills.skills AS skill,
-            COUNT(skill_to_job.job_id) AS total_jobs
-        FROM job_postings_fact AS jobs
-        INNER JOIN skills_job_dim AS skill_to_job ON jobs.job_id = skill_to_job.job_id
-        INNER JOIN skills_dim AS skills ON skill_to_job.skill_id = skills.skill_id
-        {skill_where} AND salary_year_avg IS NOT NULL
-        GROUP BY skill_to_job.skill_id, skills.skills
-    ),
-    average_salary AS (
-        SELECT
-            skill_to_job.skill_id,
-            skills.skills AS skill,
-            ROUND(AVG(salary_year_avg), 0) AS avg_salary
-        FROM job_postings_fact AS jobs
-        INNER JOIN skills_job_dim AS skill_to_job ON jobs.job_id = skill_to_job.job_id
-        INNER JOIN skills_dim AS skills ON skill_to_job.skill_id = skills.skill_id
-        {skill_where} AND salary_year_avg IS NOT NULL
-        GROUP BY skill_to_job.skill_id, skills.skills
-    )
-    SELECT
-        skill_demand.skill,
-        skill_demand.total_jobs,
-        average_salary.avg_salary
-    FROM skill_demand
-    INNER JOIN average_salary ON skill_demand.skill_id = average_salary.skill_id
-    WHERE skill_demand.total_jobs > 50
-    ORDER BY average_salary.avg_salary DESC, skill_demand.total_jobs DESC
-    LIMIT 15 """
-
-    df_skill_scatter = load_data(scatter_sql)
+    scatter_sql = q.optimal_skills_sql(skill_where)
+
+    df_skill_scatter = load_data(scatter_sql, q.OPTIMAL_SKILLS_SCHEMA)
     if not df_skill_scatter.empty:
 
         df_skill_scatter['skill'] = df_skill_scatter['skill'].str.title()
@@ -693,8 +598,7 @@ elif page == "🛠️ Skill Economics":
     st.markdown("<p style='color:#ffdb58; font-size:15px; margin-top:-10px;'>💡 Use the <b>skill dropdown below</b> to select a primary skill. The chart shows the top 10 skills that most frequently appear alongside it in the same job posting.</p>", unsafe_allow_html=True)
 
     # Skills dropdown
-    skills_list_sql = """SELECT DISTINCT(skills) AS skills FROM skills_dim ORDER BY skills ASC"""
-    df_skills = load_data(skills_list_sql)
+    df_skills = load_data(q.SKILLS_LIST_SQL)
 
     if not df_skills.empty:
         skill_options = sorted([s.title() for s in df_skills['skills'].tolist()])
@@ -706,24 +610,9 @@ elif page == "🛠️ Skill Economics":
             selected_skill = st.selectbox("", skill_options, index=default_idx, key="cooc_skill")
 
         # Co-occurrence SQL
-        cooc_sql = f"""
-            SELECT
-                s2.skills AS co_skill,
-                COUNT(*) AS co_occurrences
-            FROM skills_job_dim AS sj1
-            INNER JOIN skills_job_dim AS sj2
-                ON sj1.job_id = sj2.job_id
-                AND sj1.skill_id != sj2.skill_id
-            INNER JOIN skills_dim AS s1 ON sj1.skill_id = s1.skill_id
-            INNER JOIN skills_dim AS s2 ON sj2.skill_id = s2.skill_id
-            INNER JOIN job_postings_fact AS jobs ON sj1.job_id = jobs.job_id
-            WHERE LOWER(s1.skills) = LOWER('{selected_skill}')
-            {skill_where.replace("WHERE 1=1", "").strip()}
-            GROUP BY s2.skills
-            ORDER BY co_occurrences DESC
-            LIMIT 10 """
-
-        df_cooc = load_data(cooc_sql)
+        cooc_sql = q.cooccurrence_sql(skill_where, selected_skill)
+
+        df_cooc = load_data(cooc_sql, q.COOCCURRENCE_SCHEMA)
 
         if not df_cooc.empty:
             df_cooc['co_skill'] = df_cooc['co_skill'].str.title()
@@ -773,51 +662,53 @@ elif page == "🏢 Top Hiring Companies":
     st.subheader("💸 Highest Paying Employers — 2023")
     st.markdown("<div style='margin-bottom:15px;'></div>", unsafe_allow_html=True)
 
-    col_country, col_basis, col_spacer = st.columns([1, 1, 1.5])
+    col_country, col_basis, col_min, col_spacer = st.columns([1, 1, 1, 0.5])
     with col_country:
         st.markdown("<div style='font-size:16px; font-weight:500; margin-bottom:-10px;'>🌍 Select Country</div>", unsafe_allow_html=True)
-        company_country = st.selectbox("", ["Select All"] + COUNTRY_LIST, key="company_country")
+        company_country = st.selectbox("", [q.ALL_COUNTRIES] + COUNTRY_LIST, key="company_country")
 
     with col_basis:
         st.markdown("<div style='font-size:16px; font-weight:500; margin-bottom:-10px;'>💰 Salary Basis</div>", unsafe_allow_html=True)
         company_salary_basis = st.selectbox("", ["Yearly", "Hourly"], key="company_basis")
 
+    with col_min:
+        st.markdown("<div style='font-size:16px; font-weight:500; margin-bottom:-10px;'>📏 Min. Salaried Postings</div>", unsafe_allow_html=True)
+        company_min_postings = st.slider("", min_value=1, max_value=50, value=5, key="company_min_postings")
+
     st.markdown("<div style='padding-top: 15px;'></div>", unsafe_allow_html=True)
 
     col_to_use = "salary_year_avg" if company_salary_basis == "Yearly" else "salary_hour_avg"
-    label_text = "Avg Yearly Salary ($)" if company_salary_basis == "Yearly" else "Avg Hourly Salary ($)"
+    label_text = "Adjusted Avg Yearly Salary ($)" if company_salary_basis == "Yearly" else "Adjusted Avg Hourly Salary ($)"
     
-    company_where = where_clause
-    if company_country != "Select All":
-        company_where += f" AND job_country = '{company_country}'"
-
-    company_sql = f"""
-        SELECT 
-            name AS company,
-            ROUND(AVG({col_to_use}), 0) AS avg_salary
-        FROM job_postings_fact AS jobs
-        INNER JOIN company_dim AS companies ON jobs.company_id = companies.company_id
-        {company_where} AND {col_to_use} IS NOT NULL
-        GROUP BY name
-        ORDER BY avg_salary DESC
-        LIMIT 12 """
-
-    df_company = load_data(company_sql)
+    # Ranked by the incremental leaderboard (leaderboard.py): shrunk average, minimum postings, top-12 heap
+    leaderboard = init_leaderboard()
+    # After a failure the refresh backs off for a minute instead of rerunning the aggregation on every rerun
+    try:
+        leaderboard.refresh(fetch_uncached)
+    except Exception as e:
+        if leaderboard.last_job_id:
+            st.caption("🕒 **Stale** — the database is slow or unavailable, showing the last loaded rankings.")
+        else:
+            st.error(f"Database Error: {e}")
+
+    df_company = leaderboard.top_k(col_to_use, job_filter, location_filter, company_country,
+                                   k=12, min_postings=company_min_postings)
 
     if not df_company.empty:
-        df_company = df_company.sort_values(by='avg_salary', ascending=True)
-        df_company['label'] = df_company['avg_salary'].apply(lambda x: f"${x:,.0f}")
+        # Bars show the shrunk score the ranking uses, so their order matches their length
+        df_company = df_company.sort_values(by='score', ascending=True)
+        df_company['label'] = df_company['score'].apply(lambda x: f"${x:,.0f}")
         
         emerald_scale = [[0.0, '#064e3b'], [0.5, '#10b981'], [1.0, '#34d399']]
         
-        fig_company = px.bar(df_company, x='avg_salary', y='company',
-                             orientation='h', text='label', color='avg_salary',
+        fig_company = px.bar(df_company, x='score', y='company',
+                             orientation='h', text='label', color='score',
                              color_continuous_scale=emerald_scale,
-                             custom_data=['company', 'avg_salary'],
-                             labels={'avg_salary': label_text, 'company': 'Company'})
+                             custom_data=['company', 'score', 'avg_salary', 'postings'],
+                             labels={'score': label_text, 'company': 'Company'})
 
         fig_company.update_traces(textposition='inside', insidetextanchor='end', texttemplate='%{text}  ',
-                                    hovertemplate='<b>%{customdata[0]}</b><br>Avg Salary: <b>$%{customdata[1]:,.0f}</b><extra></extra>', 
+                                    hovertemplate='<b>%{customdata[0]}</b><br>Adjusted Salary: <b>$%{customdata[1]:,.0f}</b><br>Raw Avg Salary: <b>$%{customdata[2]:,.0f}</b><br>Salaried Postings: <b>%{customdata[3]:,}</b><extra></extra>', 
                                   textfont=dict(color='white', size=15))
 
         fig_company.update_layout(xaxis_title=label_text, yaxis_title="", font=dict(weight='bold'),
@@ -830,5 +721,109 @@ elif page == "🏢 Top Hiring Companies":
         fig_company.update_yaxes(showgrid=False, tickfont=dict(size=14))
 
         st.plotly_chart(fig_company, use_container_width=True, config={'displayModeBar': False})
+        st.caption(f"Ranked by average salary shrunk towards the market average, weighted as {leaderboard.prior_weight} extra "
+                   "postings at the market rate, so a few high-paying postings can't top the board. Hover a bar for the raw average.")
     else:
         st.info(f"No hiring data available for the current selection.")
+
+# Page 6: Demand Trends
+elif page == "📈 Demand Trends":
+    col_title, col_filter = st.columns([4,1])
+    with col_title:
+        st.title("📈 Skill Demand Trends")
+        st.markdown('<hr style="margin-top:10px; margin-bottom:10px; border: 1px solid rgba(255,255,255,0.1)">', unsafe_allow_html=True)
+
+    with col_filter:
+        st.markdown("<div style='font-size:18px; margin-bottom:-12px; margin-top:0px;'>🌍 Select Country</div>", unsafe_allow_html=True)
+        trend_country = st.selectbox("", [q.ALL_COUNTRIES] + COUNTRY_LIST, key="trend_country")
+
+    # Reads the daily rollup (sql_load/4_create trend rollup.sql), never the raw fact table
+    trend_where = q.build_where(job_filter, location_filter, trend_country)
+
+    bounds = load_data(q.TREND_BOUNDS_SQL, q.TREND_BOUNDS_SCHEMA)
+
+    if not bounds.empty and pd.notna(bounds['first_day'].iloc[0]):
+        first_day = pd.to_datetime(bounds['first_day'].iloc[0]).date()
+        last_day = pd.to_datetime(bounds['last_day'].iloc[0]).date()
+
+        col_window, col_grain, col_skills = st.columns([1.2, 0.8, 2.5])
+        with col_window:
+            st.markdown("<div style='font-size:16px; font-weight:500; margin-bottom:-10px;'>📅 Date Window</div>", unsafe_allow_html=True)
+            window = st.date_input("", value=(first_day, last_day), min_value=first_day, max_value=last_day, key="trend_window")
+
+        with col_grain:
+            st.markdown("<div style='font-size:16px; font-weight:500; margin-bottom:-10px;'>⏱️ Granularity</div>", unsafe_allow_html=True)
+            grain_ui = st.selectbox("", ["Weekly", "Monthly"], key="trend_grain")
+
+        # date_input returns () once the picker is cleared and a single date while the user is still picking the range
+        if len(window) == 0:
+            st.info("Pick a date window to plot demand trends.")
+        else:
+            start_date, end_date = window if len(window) == 2 else (window[0], window[0])
+            grain = "week" if grain_ui == "Weekly" else "month"
+            window_where = q.trend_window_where(trend_where, start_date, end_date)
+
+            # Default selection: the top 5 skills in the chosen window
+            top_trend_sql = q.top_trend_skills_sql(window_where)
+            df_top_trend = load_data(top_trend_sql, q.TOP_TREND_SKILLS_SCHEMA)
+            skill_list = load_data(q.SKILLS_LIST_SQL)
+
+            skill_options = sorted([s.title() for s in skill_list['skills'].tolist()]) if not skill_list.empty else []
+            default_skills = [s.title() for s in df_top_trend['skills'].tolist()] if not df_top_trend.empty else []
+
+            with col_skills:
+                st.markdown("<div style='font-size:16px; font-weight:500; margin-bottom:-10px;'>🛠️ Skills</div>", unsafe_allow_html=True)
+                trend_skills = st.multiselect("", skill_options, default=default_skills, max_selections=10, key="trend_skills")
+
+            if trend_skills:
+                trend_sql = q.trend_sql(window_where, trend_skills, grain)
+                df_trend = load_data(trend_sql, q.TREND_SCHEMA)
+
+                if not df_trend.empty:
+                    df_trend['skills'] = df_trend['skills'].str.title()
+
+                    st.subheader(f"🔥 {grain_ui} Job Demand by Skill")
+                    fig_trend = px.line(df_trend, x='period', y='postings', color='skills', markers=True,
+                                        custom_data=['skills'],
+                                        labels={'period': 'Posted', 'postings': 'Job Demand', 'skills': 'Skill'})
+
+                    fig_trend.update_traces(
+                        hovertemplate='<b>%{customdata[0]}</b><br>%{x|%d %b %Y}<br>Job Demand: <b>%{y:,}</b><extra></extra>')
+
+                    fig_trend.update_layout(font=dict(weight='bold'), margin=dict(t=20, b=20),
+                                            hoverlabel=dict(bgcolor='#1e293b', bordercolor='#10b981', font=dict(color='white', size=13)),
+                                            plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+                                            modebar=dict(bgcolor='rgba(0,0,0,0)', color='#94a3b8', activecolor='#10b981', orientation='h'))
+
+                    fig_trend.update_xaxes(showgrid=False, tickfont=dict(size=14), title_font=dict(size=16))
+                    fig_trend.update_yaxes(showgrid=False, tickfont=dict(size=14), title_font=dict(size=16))
+
+                    st.plotly_chart(fig_trend, use_container_width=True, config={'displayModeBar': False})
+                    st.markdown('<hr style="margin-top:0px; margin-bottom:40px; border: 1px solid rgba(255,255,255,0.1)">', unsafe_allow_html=True)
+
+                    # Salary trend, only where the skill had postings with a yearly salary
+                    df_trend_salary = df_trend.dropna(subset=['avg_salary'])
+                    if not df_trend_salary.empty:
+                        st.subheader(f"💰 {grain_ui} Avg Yearly Salary by Skill")
+                        fig_trend_salary = px.line(df_trend_salary, x='period', y='avg_salary', color='skills', markers=True,
+                                                   custom_data=['skills'],
+                                                   labels={'period': 'Posted', 'avg_salary': 'Avg Yearly Salary ($)', 'skills': 'Skill'})
+
+                        fig_trend_salary.update_traces(
+                            hovertemplate='<b>%{customdata[0]}</b><br>%{x|%d %b %Y}<br>Avg Salary: <b>$%{y:,.0f}</b><extra></extra>')
+
+                        fig_trend_salary.update_layout(font=dict(weight='bold'), margin=dict(t=20, b=20),
+                                                       hoverlabel=dict(bgcolor='#1e293b', bordercolor='#10b981', font=dict(color='white', size=13)),
+                                                       plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+                                                       modebar=dict(bgcolor='rgba(0,0,0,0)', color='#94a3b8', activecolor='#10b981', orientation='h'))
+
+                        fig_trend_salary.update_xaxes(showgrid=False, tickfont=dict(size=14), title_font=dict(size=16))
+                        fig_trend_salary.update_yaxes(showgrid=False, tickformat="$~s", tickfont=dict(size=14), title_font=dict(size=16))
+
+                        st.plotly_chart(fig_trend_salary, use_container_width=True, config={'displayModeBar': False})
+                else:
+                    st.info("No trend data available for the current selection.")
+            else:
+                st.info("Select at least one skill to plot its demand trend.")
+    else:
+        st.info("Trend rollup is empty. Run sql_load/4_create trend rollup.sql to build it.")
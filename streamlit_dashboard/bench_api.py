@@ -0,0 +1,99 @@
+"""
+Requests/sec benchmark for the aggregate API (api.py).
+
+Start the API against a local Postgres stand-in first, then:
+
+    python bench_api.py --base-url http://127.0.0.1:8000 --clients 16 --duration 30
+
+Each client picks random endpoints and sidebar-style filters. With --revalidate, clients
+replay the ETag they got last time for that URL, which measures the 304 path.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+import queries as q
+
+ENDPOINTS = ["top-skills", "optimal-skills", "top-paying-skills", "top-paying-roles", "top-companies", "cooccurrence"]
+SAMPLE_COUNTRIES = [q.ALL_COUNTRIES, "United States", "India", "United Kingdom", "Germany"]
+SAMPLE_SKILLS = ["python", "sql", "excel", "aws", "tableau"]
+
+
+def random_url(rng, base_url):
+    endpoint = rng.choice(ENDPOINTS)
+    params = {
+        "job_filter": rng.choice(q.JOB_CATEGORIES),
+        "location_filter": rng.choice(q.LOCATION_TYPES),
+        "country": rng.choice(SAMPLE_COUNTRIES),
+    }
+    if endpoint == "top-paying-skills":
+        params["skill_type"] = rng.choice(list(q.SKILL_TYPES))
+    if endpoint in ("top-paying-roles", "top-companies"):
+        params["salary_basis"] = rng.choice(list(q.SALARY_BASIS))
+    if endpoint == "cooccurrence":
+        params["skill"] = rng.choice(SAMPLE_SKILLS)
+    return f"{base_url}/v1/{endpoint}?{urlencode(params)}"
+
+
+def client(rng, base_url, deadline, revalidate, results):
+    etags = {}
+    while time.monotonic() < deadline:
+        url = random_url(rng, base_url)
+        request = urllib.request.Request(url)
+        if revalidate and url in etags:
+            request.add_header("If-None-Match", etags[url])
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                status = response.status
+                etags[url] = response.headers.get("ETag", "")
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = 0
+        results.append((status, time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--revalidate", action="store_true", help="send If-None-Match with known ETags")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = []
+    deadline = time.monotonic() + args.duration
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(random.Random(args.seed + i), args.base_url, deadline, args.revalidate, results))
+               for i in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    latencies = sorted(lat for _, lat in results)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0.0
+
+    print(f"Requests      : {len(results)} in {elapsed:.1f}s with {args.clients} clients")
+    print(f"Throughput    : {len(results) / elapsed:.1f} req/s")
+    print(f"Latency (ms)  : mean {statistics.fmean(latencies) * 1000 if latencies else 0:.1f}  "
+          f"p50 {pct(50):.1f}  p95 {pct(95):.1f}  p99 {pct(99):.1f}")
+    print(f"Status codes  : {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Memory and latency benchmark for query results: driver defaults vs. the typed path.
+
+"Driver default" is what pd.read_sql used to hand back: NUMERIC aggregates as Decimal
+objects in object columns, dates as datetime.date objects and labels as plain strings.
+"Typed" is the same frame after the NUMERIC -> float typecaster and db_conn.coerce with
+the template's schema from queries.py. For each we measure in-memory size, pickled size
+(what st.cache_data stores), pickle round-trip time and the cost of coercing.
+
+Runs on synthetic frames shaped and sized like the dashboard queries, so no database is
+needed. The biggest result the dashboard can ask for is the trend series: at most 10
+skills x 53 weekly periods, i.e. about 530 rows.
+
+    python bench_results.py --skills 10 --weeks 53 --repeat 200
+"""
+import argparse
+import datetime as dt
+import pickle
+import random
+import time
+from decimal import Decimal
+
+import pandas as pd
+
+import queries as q
+from db_conn import coerce
+
+
+def driver_default_frames(n_skills, n_weeks, rng):
+    """ Frames as psycopg2 + pandas return them without a typecaster or schema"""
+    skills = [f"skill_{i}" for i in range(250)]
+    weeks = [dt.date(2023, 1, 2) + dt.timedelta(weeks=i) for i in range(n_weeks)]
+    # One row per (period, skill), as trend_sql groups them; SUM over INT is bigint (int64 already),
+    # only the ROUNDed NUMERIC average comes back as Decimal
+    grid = [(week, skill) for week in weeks for skill in skills[:n_skills]]
+    trend = pd.DataFrame({
+        "period": [week for week, _ in grid],
+        "skills": [skill for _, skill in grid],
+        "postings": [rng.randint(1, 5000) for _ in grid],
+        "avg_salary": [Decimal(rng.randint(40000, 250000)) for _ in grid],
+    })
+    optimal = pd.DataFrame({
+        "skill": skills[:15],
+        "total_jobs": [rng.randint(50, 20000) for _ in range(15)],
+        "avg_salary": [Decimal(rng.randint(40000, 250000)) for _ in range(15)],
+    })
+    kpi = pd.DataFrame({"total": [785000], "sal": [Decimal("123456")], "remote_pct": [Decimal("8.4")]})
+    return {"trend": (trend, q.TREND_SCHEMA), "optimal_skills": (optimal, q.OPTIMAL_SKILLS_SCHEMA), "kpi": (kpi, q.KPI_SCHEMA)}
+
+
+def as_driver_floats(df):
+    """ What the NUMERIC -> float typecaster yields before coerce()"""
+    return df.apply(lambda col: col.map(float) if isinstance(col.iloc[0], Decimal) else col)
+
+
+def measure(df, repeat):
+    blob = pickle.dumps(df)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pickle.loads(pickle.dumps(df))
+    return {
+        "memory_kb": df.memory_usage(deep=True).sum() / 1024,
+        "pickle_kb": len(blob) / 1024,
+        "pickle_roundtrip_ms": (time.perf_counter() - start) / repeat * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=10, help="skills in the trend result (the page allows 10)")
+    parser.add_argument("--weeks", type=int, default=53, help="weekly periods in the trend result")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for name, (raw, schema) in driver_default_frames(args.skills, args.weeks, random.Random(args.seed)).items():
+        start = time.perf_counter()
+        typed = coerce(as_driver_floats(raw), schema)
+        coerce_ms = (time.perf_counter() - start) * 1000
+
+        before, after = measure(raw, args.repeat), measure(typed, args.repeat)
+        print(f"{name} ({len(raw):,} rows), typecaster + coerce: {coerce_ms:.1f} ms")
+        for metric in before:
+            ratio = before[metric] / after[metric] if after[metric] else float("inf")
+            print(f"    {metric:<20} {before[metric]:>10.1f} -> {after[metric]:>10.1f}   ({ratio:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,100 @@
+import math
+import threading
+import time
+
 import streamlit as st
+import pandas as pd
+from psycopg2.extensions import DECIMAL, new_type, register_type
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool
+
+# Query governor limits (see governor.py)
+QUERY_DEADLINE_S = 15
+MAX_CONCURRENT_QUERIES = 4
+# Upper bound on opening a connection; run_query lowers it to the query's remaining budget
+CONNECT_TIMEOUT_S = 5
+
+# NUMERIC -> float in the driver, so aggregates never materialise as Decimal objects
+NUMERIC_AS_FLOAT = new_type(DECIMAL.values, "NUMERIC_AS_FLOAT", lambda value, cur: float(value) if value is not None else None)
+
+# Deadline of the query running on this thread, read while its connection is checked out or opened
+_deadline = threading.local()
+
+def remaining_budget(default):
+    """ Seconds left for the query running on this thread, or `default` outside run_query"""
+    expires = getattr(_deadline, "expires", None)
+    return default if expires is None else max(0.0, expires - time.monotonic())
+
+class DeadlinePool(QueuePool):
+    """ QueuePool whose checkout wait never outlasts the running query's remaining budget"""
+
+    @property
+    def _timeout(self):
+        return min(self._pool_timeout, remaining_budget(self._pool_timeout))
+
+    @_timeout.setter
+    def _timeout(self, value):
+        self._pool_timeout = value
 
 def get_connection():
     # This looks for [connections.postgresql] in secrets.toml
-    conn = st.connection("aiven_db", type="sql")
+    # Pool is capped at the governor's concurrency so a traffic spike can't pile up connections
+    conn = st.connection("aiven_db", type="sql", poolclass=DeadlinePool,
+                         pool_size=MAX_CONCURRENT_QUERIES, max_overflow=0,
+                         pool_timeout=QUERY_DEADLINE_S, pool_pre_ping=True,
+                         connect_args={"connect_timeout": CONNECT_TIMEOUT_S})
+    use_float_numerics(conn.engine)
+    use_query_deadlines(conn.engine)
     return conn
 
+def use_query_deadlines(engine):
+    """ Cap connect_timeout of new connections of `engine` at the running query's remaining budget"""
+    if not event.contains(engine, "do_connect", _cap_connect_timeout):
+        event.listen(engine, "do_connect", _cap_connect_timeout)
+
+def _cap_connect_timeout(dialect, conn_rec, cargs, cparams):
+    limit = cparams.get("connect_timeout", CONNECT_TIMEOUT_S)
+    # libpq takes whole seconds and treats anything below 2 as 2 (0 would mean wait forever)
+    cparams["connect_timeout"] = max(2, min(int(limit), math.ceil(remaining_budget(limit))))
+
+def use_float_numerics(engine):
+    """ Register the NUMERIC -> float typecaster on every new connection of `engine`"""
+    if not event.contains(engine, "connect", _register_numeric_caster):
+        event.listen(engine, "connect", _register_numeric_caster)
+
+def _register_numeric_caster(dbapi_conn, connection_record):
+    register_type(NUMERIC_AS_FLOAT, dbapi_conn)
+
+def coerce(df, schema):
+    """ Cast result columns to the dtypes in `schema` (see queries.py *_SCHEMA)"""
+    for col, dtype in schema.items():
+        if col not in df:
+            continue
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+        elif dtype.startswith("datetime"):
+            df[col] = pd.to_datetime(df[col])
+        else:
+            values = pd.to_numeric(df[col], errors="coerce")
+            # NULL aggregates (e.g. AVG over no rows) can't live in a numpy int column
+            if dtype.startswith("int") and values.isna().any():
+                dtype = "float32"
+            df[col] = values.astype(dtype)
+    return df
+
+def query_key(query, schema=None):
+    """ Governor key for `query` read with `schema`: the same SQL with other dtypes is a different result"""
+    return (query, tuple(sorted(schema.items())) if schema else None)
 
+def run_query(engine, query, timeout_ms, schema=None):
+    """ Execute a query with a server-side statement_timeout and return a DataFrame"""
+    # The pool checkout and any reconnect below are bounded by the same budget as the statement
+    _deadline.expires = time.monotonic() + timeout_ms / 1000
+    try:
+        with engine.connect() as conn:
+            # set_config(..., true) only lasts for this transaction, so pooled connections stay clean
+            conn.execute(text("SELECT set_config('statement_timeout', :ms, true)"), {"ms": str(timeout_ms)})
+            df = pd.read_sql(text(query), conn)
+    finally:
+        _deadline.expires = None
+    return coerce(df, schema) if schema else df
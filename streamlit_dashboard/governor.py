@@ -0,0 +1,123 @@
+"""
+Execution governor that sits in front of every database query.
+
+- Deadline: every query gets a time budget; the remaining budget is handed to the query
+  function (used as Postgres `statement_timeout`) and also bounds any waiting below.
+- Admission control: at most `max_concurrent` queries are in flight; extra callers queue
+  first-come first-served and give up once their deadline passes.
+- Single-flight: identical queries that arrive while one is already running wait for that
+  result instead of hitting the database again.
+- Last known good: the latest successful result per query is kept so the caller can show
+  stale data instead of an empty chart when the database is slow or down.
+
+Nothing here depends on Streamlit, so any front end can share one governor.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+
+class QueryTimeout(TimeoutError):
+    """ Raised when a query could not be admitted or finished within its deadline"""
+
+
+class FairSemaphore:
+    """ Counting semaphore that grants permits strictly in arrival order"""
+
+    def __init__(self, value):
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters = deque()
+
+    def acquire(self, timeout):
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return True
+            turn = threading.Event()
+            self._waiters.append(turn)
+
+        if turn.wait(timeout):
+            return True
+        with self._lock:
+            # The permit may have been handed over just as we timed out
+            if turn.is_set():
+                return True
+            self._waiters.remove(turn)
+            return False
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # Hand the permit straight to the next waiter so nobody can barge in
+                self._waiters.popleft().set()
+            else:
+                self._value += 1
+
+
+class QueryGovernor:
+    """ Deadline, fair admission, single-flight and last-known-good cache for queries"""
+
+    def __init__(self, max_concurrent=4, deadline=15.0, max_stale_entries=256):
+        self.max_concurrent = max_concurrent
+        self.deadline = deadline
+        self.max_stale_entries = max_stale_entries
+        self._semaphore = FairSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._last_good = OrderedDict()
+
+    def run(self, key, fn, deadline=None):
+        """
+        Run `fn(timeout_ms)` for `key` under the governor and return its result.
+        Raises QueryTimeout when the deadline passes, or whatever `fn` raised.
+        """
+        budget = self.deadline if deadline is None else deadline
+        expires = time.monotonic() + budget
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            try:
+                return future.result(timeout=max(0.0, expires - time.monotonic()))
+            except FutureTimeout:
+                raise QueryTimeout(f"Query did not finish within {budget:.0f}s") from None
+
+        try:
+            if not self._semaphore.acquire(timeout=max(0.0, expires - time.monotonic())):
+                raise QueryTimeout(f"Query was not admitted within {budget:.0f}s, too many queries in flight")
+            try:
+                remaining_ms = int((expires - time.monotonic()) * 1000)
+                if remaining_ms <= 0:
+                    raise QueryTimeout(f"Query was not admitted within {budget:.0f}s, too many queries in flight")
+                result = fn(remaining_ms)
+            finally:
+                self._semaphore.release()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            self._remember(key, result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def last_good(self, key):
+        """ Latest successful result for `key`, or None if it never succeeded"""
+        with self._lock:
+            return self._last_good.get(key)
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._last_good[key] = result
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.max_stale_entries:
+                self._last_good.popitem(last=False)
@@ -0,0 +1,121 @@
+"""
+Incremental top-k leaderboard of highest-paying companies.
+
+Keeps a running posting count and salary sum per company for every dashboard slice
+(job category x remote x country, each also rolled up to "All", per salary basis), so
+ranking a slice never re-sorts the fact table:
+
+- Updates are additive: `add` folds in pre-aggregated rows and `refresh` pulls only the
+  postings with a job_id above the last one seen.
+- Ranking uses a Bayesian-shrunk average, (sum + m * slice_mean) / (count + m), so a
+  single high-salary posting can't top the board, plus a hard minimum-postings cut.
+- `top_k` picks the winners with a bounded heap (heapq.nlargest), O(n log k) per slice.
+
+Nothing here depends on Streamlit; App.py keeps one instance in st.cache_resource.
+"""
+import heapq
+import threading
+import time
+
+import pandas as pd
+
+import queries as q
+
+BASIS_COLUMNS = {"salary_year_avg": ("year_count", "year_sum"), "salary_hour_avg": ("hour_count", "hour_sum")}
+
+
+class CompanyLeaderboard:
+    """ Running per-slice company salary stats with shrunk-average top-k ranking"""
+
+    def __init__(self, min_postings=5, prior_weight=10):
+        self.min_postings = min_postings
+        self.prior_weight = prior_weight
+        self.last_job_id = 0
+        self.last_refresh = 0.0
+        # Caller's data version as of the last successful refresh, see `refresh`
+        self.version = None
+        self._error = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # (basis, job_title_short | None, remote True | None, country | None) -> {company: [count, sum]}
+        self._companies = {}
+        # same key -> [count, sum] over every company, for the shrinkage prior
+        self._totals = {}
+
+    @staticmethod
+    def slice_key(col_to_use, job_filter="All", location_filter="Global", country=q.ALL_COUNTRIES):
+        return (col_to_use,
+                None if job_filter == "All" else job_filter,
+                True if location_filter == "Remote Only" else None,
+                None if country == q.ALL_COUNTRIES else country)
+
+    def add(self, df):
+        """ Fold in rows shaped like queries.leaderboard_sql (one per company x base slice)"""
+        if df.empty:
+            return
+        with self._lock:
+            for row in df.itertuples(index=False):
+                titles = (None,) if pd.isna(row.job_title_short) else (row.job_title_short, None)
+                remotes = (True, None) if row.job_work_from_home else (None,)
+                countries = (None,) if pd.isna(row.job_country) else (row.job_country, None)
+                for col_to_use, (count_col, sum_col) in BASIS_COLUMNS.items():
+                    count = getattr(row, count_col)
+                    if not count:
+                        continue
+                    total = float(getattr(row, sum_col))
+                    for title in titles:
+                        for remote in remotes:
+                            for country in countries:
+                                key = (col_to_use, title, remote, country)
+                                stats = self._companies.setdefault(key, {}).setdefault(row.company, [0, 0.0])
+                                stats[0] += count
+                                stats[1] += total
+                                slice_total = self._totals.setdefault(key, [0, 0.0])
+                                slice_total[0] += count
+                                slice_total[1] += total
+            self.last_job_id = max(self.last_job_id, int(df["max_job_id"].max()))
+
+    def refresh(self, fetch, min_interval=600, version=None, retry_after=60):
+        """
+        Pull postings appended since the last refresh, at most every `min_interval` seconds, or
+        straight away when `version` (the caller's data version) differs from the last refresh's.
+        `fetch(sql, schema)` returns a DataFrame and should raise on failure; that error is then
+        raised again without querying for `retry_after` seconds, so an outage doesn't make every
+        caller rerun the aggregation with its whole budget.
+        """
+        # One refresher at a time, otherwise two sessions could fold in the same delta twice
+        with self._refresh_lock:
+            now = time.monotonic()
+            if self._error is not None and now < self._retry_at:
+                raise self._error.with_traceback(None)
+            if (version is None or version == self.version) and now - self.last_refresh < min_interval:
+                return
+            try:
+                df = fetch(q.leaderboard_sql(self.last_job_id), q.LEADERBOARD_SCHEMA)
+            except Exception as e:
+                self._error, self._retry_at = e, time.monotonic() + retry_after
+                raise
+            self.add(df)
+            self._error = None
+            self.last_refresh = time.monotonic()
+            self.version = version
+
+    def top_k(self, col_to_use, job_filter="All", location_filter="Global", country=q.ALL_COUNTRIES,
+              k=12, min_postings=None, prior_weight=None):
+        """ Top `k` companies of a slice by shrunk average salary, as a DataFrame"""
+        min_postings = self.min_postings if min_postings is None else min_postings
+        m = self.prior_weight if prior_weight is None else prior_weight
+        key = self.slice_key(col_to_use, job_filter, location_filter, country)
+
+        with self._lock:
+            companies = self._companies.get(key, {})
+            slice_count, slice_sum = self._totals.get(key, (0, 0.0))
+            prior = slice_sum / slice_count if slice_count else 0.0
+            top = heapq.nlargest(
+                k,
+                ((company, n, total / n, (total + m * prior) / (n + m))
+                 for company, (n, total) in companies.items() if n >= min_postings),
+                key=lambda entry: entry[3])
+
+        return pd.DataFrame(top, columns=["company", "postings", "avg_salary", "score"])
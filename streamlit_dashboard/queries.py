@@ -0,0 +1,254 @@
+"""
+SQL templates behind every dashboard chart.
+
+Shared by App.py and the headless API (api.py) so both always return the same numbers.
+Each builder takes the already-built WHERE clause (see build_where) plus the chart's own
+options and returns the SQL string passed to load_data / the query governor.
+
+Every template also has a *_SCHEMA: the dtype each result column is coerced to (see
+db_conn.coerce). Counts become int64, NUMERIC salary aggregates float32, dates datetime64
+and labels that repeat across rows (skills in the trend series) categoricals, so cached
+results are small and cheap to pickle. Unlisted columns keep what the driver returned.
+"""
+
+JOB_CATEGORIES = ["All", "Data Analyst", "Data Scientist", "Data Engineer", "Business Analyst",
+                  "Machine Learning Engineer", "Senior Data Analyst", "Senior Data Engineer",
+                  "Senior Data Scientist", "Software Engineer", "Cloud Engineer"]
+
+LOCATION_TYPES = ["Global", "Remote Only"]
+
+SALARY_BASIS = {"Yearly": "salary_year_avg", "Hourly": "salary_hour_avg"}
+
+# Mapping UI labels to original database values
+SKILL_TYPES = {
+    "All": "All",
+    "Languages": "programming",
+    "Tools": "analyst_tools",
+    "Databases": "Databases",
+    "Cloud": "Cloud",
+    "Libraries": "Libraries",
+    "Frameworks": "webframeworks" }
+
+ALL_COUNTRIES = "Select All"
+
+
+def sql_literal(value):
+    """ Quote a value as a SQL string literal"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_where(job_filter="All", location_filter="Global", country=ALL_COUNTRIES):
+    """ Dynamic SQL Where Clause for the sidebar filters and the page's country selector"""
+    where_clause = "WHERE 1=1"
+    if job_filter != "All":
+        where_clause += f" AND job_title_short = {sql_literal(job_filter)}"
+    if location_filter == "Remote Only":
+        where_clause += " AND job_work_from_home IS TRUE"
+    if country != ALL_COUNTRIES:
+        where_clause += f" AND job_country = {sql_literal(country)}"
+    return where_clause
+
+
+COUNTRIES_SQL = """
+        SELECT DISTINCT job_country
+        FROM job_postings_fact
+        WHERE job_country <> 'Israel' AND job_country IS NOT NULL
+        ORDER BY job_country ASC """
+
+SKILLS_LIST_SQL = """SELECT DISTINCT(skills) AS skills FROM skills_dim ORDER BY skills ASC"""
+
+TREND_BOUNDS_SQL = "SELECT MIN(day) AS first_day, MAX(day) AS last_day FROM skill_demand_daily"
+TREND_BOUNDS_SCHEMA = {"first_day": "datetime64[ns]", "last_day": "datetime64[ns]"}
+
+KPI_SCHEMA = {"total": "int64", "sal": "float32", "remote_pct": "float32"}
+TOP_SKILLS_SCHEMA = {"total_jobs": "int64"}
+ROLE_BENCHMARK_SCHEMA = {"salary_year_avg": "float32", "salary_hour_avg": "float32", "market_avg": "float32"}
+TOP_PAYING_SKILLS_SCHEMA = {"avg_salary": "float32", "rnk": "int16"}
+ROLE_SALARY_SCHEMA = {"avg_salary": "float32"}
+OPTIMAL_SKILLS_SCHEMA = {"total_jobs": "int64", "avg_salary": "float32"}
+COOCCURRENCE_SCHEMA = {"co_occurrences": "int64"}
+TOP_TREND_SKILLS_SCHEMA = {"postings": "int64"}
+LEADERBOARD_SCHEMA = {"max_job_id": "int64", "year_count": "int64", "year_sum": "float64",
+                      "hour_count": "int64", "hour_sum": "float64"}
+TREND_SCHEMA = {"period": "datetime64[ns]", "skills": "category", "postings": "int64", "avg_salary": "float32"}
+
+
+def kpi_sql(where):
+    return f"""
+        SELECT
+            COUNT(job_id) as total,
+            ROUND(AVG(salary_year_avg), 0) as sal,
+            ROUND(SUM(CASE WHEN job_work_from_home IS TRUE THEN 1 ELSE 0 END) * 100.0 / COUNT(job_id), 1) as remote_pct
+        FROM job_postings_fact
+        {where} """
+
+
+def top_skills_sql(where, limit=10):
+    return f"""
+        SELECT
+            skills,
+            COUNT(skill_to_job.job_id) AS total_jobs
+        FROM job_postings_fact AS jobs
+        INNER JOIN skills_job_dim AS skill_to_job ON jobs.job_id = skill_to_job.job_id
+        INNER JOIN skills_dim AS skills ON skill_to_job.skill_id = skills.skill_id
+        {where}
+        GROUP BY skills
+        ORDER BY total_jobs DESC
+        LIMIT {int(limit)} """
+
+
+def role_benchmark_sql(where, col_to_use):
+    return f"""
+        SELECT
+            job_title_short,
+            ROUND(AVG({col_to_use}), 0) AS {col_to_use},
+            (SELECT ROUND(AVG({col_to_use}), 0) FROM job_postings_fact
+                 {where} AND {col_to_use} IS NOT NULL) AS market_avg
+        FROM job_postings_fact
+        {where} AND {col_to_use} IS NOT NULL
+        GROUP BY job_title_short
+        ORDER BY {col_to_use} DESC
+        LIMIT 10"""
+
+
+def top_paying_skills_sql(where, skill_type="All"):
+    selected_db_val = SKILL_TYPES[skill_type]
+    if selected_db_val != "All":
+        where += f" AND LOWER(skills.type) = {sql_literal(selected_db_val.lower())}"
+    return f"""
+    WITH ranking AS (
+        SELECT
+            skills.skills,
+            ROUND(AVG(salary_year_avg), 0) AS avg_salary,
+            DENSE_RANK() OVER (ORDER BY AVG(salary_year_avg) DESC) AS rnk
+        FROM job_postings_fact AS jobs
+        INNER JOIN skills_job_dim ON jobs.job_id = skills_job_dim.job_id
+        INNER JOIN skills_dim AS skills ON skills_job_dim.skill_id = skills.skill_id
+        {where} AND salary_year_avg IS NOT NULL
+        GROUP BY skills.skills
+    )
+    SELECT * FROM ranking
+    WHERE rnk <= 10
+    ORDER BY avg_salary DESC; """
+
+
+def role_salary_sql(where, col_to_use):
+    return f"""
+        SELECT
+            job_title_short AS role,
+            ROUND(AVG({col_to_use}), 0) AS avg_salary
+        FROM job_postings_fact
+        {where} AND {col_to_use} IS NOT NULL
+        GROUP BY job_title_short
+        ORDER BY avg_salary DESC
+        LIMIT 10 """
+
+
+def optimal_skills_sql(where):
+    return f"""
+    WITH skill_demand AS (
+        SELECT
+            skill_to_job.skill_id,
+            skills.skills AS skill,
+            COUNT(skill_to_job.job_id) AS total_jobs
+        FROM job_postings_fact AS jobs
+        INNER JOIN skills_job_dim AS skill_to_job ON jobs.job_id = skill_to_job.job_id
+        INNER JOIN skills_dim AS skills ON skill_to_job.skill_id = skills.skill_id
+        {where} AND salary_year_avg IS NOT NULL
+        GROUP BY skill_to_job.skill_id, skills.skills
+    ),
+    average_salary AS (
+        SELECT
+            skill_to_job.skill_id,
+            skills.skills AS skill,
+            ROUND(AVG(salary_year_avg), 0) AS avg_salary
+        FROM job_postings_fact AS jobs
+        INNER JOIN skills_job_dim AS skill_to_job ON jobs.job_id = skill_to_job.job_id
+        INNER JOIN skills_dim AS skills ON skill_to_job.skill_id = skills.skill_id
+        {where} AND salary_year_avg IS NOT NULL
+        GROUP BY skill_to_job.skill_id, skills.skills
+    )
+    SELECT
+        skill_demand.skill,
+        skill_demand.total_jobs,
+        average_salary.avg_salary
+    FROM skill_demand
+    INNER JOIN average_salary ON skill_demand.skill_id = average_salary.skill_id
+    WHERE skill_demand.total_jobs > 50
+    ORDER BY average_salary.avg_salary DESC, skill_demand.total_jobs DESC
+    LIMIT 15 """
+
+
+def cooccurrence_sql(where, skill):
+    return f"""
+            SELECT
+                s2.skills AS co_skill,
+                COUNT(*) AS co_occurrences
+            FROM skills_job_dim AS sj1
+            INNER JOIN skills_job_dim AS sj2
+                ON sj1.job_id = sj2.job_id
+                AND sj1.skill_id != sj2.skill_id
+            INNER JOIN skills_dim AS s1 ON sj1.skill_id = s1.skill_id
+            INNER JOIN skills_dim AS s2 ON sj2.skill_id = s2.skill_id
+            INNER JOIN job_postings_fact AS jobs ON sj1.job_id = jobs.job_id
+            WHERE LOWER(s1.skills) = LOWER({sql_literal(skill)})
+            {where.replace("WHERE 1=1", "").strip()}
+            GROUP BY s2.skills
+            ORDER BY co_occurrences DESC
+            LIMIT 10 """
+
+
+def leaderboard_sql(since_job_id=0):
+    """ Per company x base slice salary counts and sums for postings after `since_job_id` (leaderboard.py)"""
+    return f"""
+        SELECT
+            name AS company,
+            job_title_short,
+            job_work_from_home,
+            job_country,
+            MAX(jobs.job_id) AS max_job_id,
+            COUNT(salary_year_avg) AS year_count,
+            SUM(salary_year_avg) AS year_sum,
+            COUNT(salary_hour_avg) AS hour_count,
+            SUM(salary_hour_avg) AS hour_sum
+        FROM job_postings_fact AS jobs
+        INNER JOIN company_dim AS companies ON jobs.company_id = companies.company_id
+        WHERE jobs.job_id > {int(since_job_id)}
+            AND (salary_year_avg IS NOT NULL OR salary_hour_avg IS NOT NULL)
+        GROUP BY name, job_title_short, job_work_from_home, job_country """
+
+
+def trend_window_where(where, start_date, end_date):
+    return f"{where} AND day BETWEEN {sql_literal(start_date)} AND {sql_literal(end_date)}"
+
+
+def top_trend_skills_sql(window_where):
+    return f"""
+            SELECT skills.skills, SUM(postings) AS postings
+            FROM skill_demand_daily AS trend
+            INNER JOIN skills_dim AS skills ON trend.skill_id = skills.skill_id
+            {window_where}
+            GROUP BY skills.skills
+            ORDER BY postings DESC
+            LIMIT 5 """
+
+
+def trend_sql(window_where, skills, grain="week"):
+    skills_in = ", ".join(sql_literal(s.lower()) for s in skills)
+    return f"""
+                SELECT
+                    date_trunc({sql_literal(grain)}, day)::DATE AS period,
+                    skills.skills,
+                    SUM(postings) AS postings,
+                    ROUND(SUM(salary_year_sum) / NULLIF(SUM(salary_year_count), 0), 0) AS avg_salary
+                FROM skill_demand_daily AS trend
+                INNER JOIN skills_dim AS skills ON trend.skill_id = skills.skill_id
+                {window_where} AND LOWER(skills.skills) IN ({skills_in})
+                GROUP BY 1, 2
+                ORDER BY 1 """
+
+
+# Cheap fingerprint of the loaded data; changes whenever postings are added, removed or re-dated
+DATA_VERSION_SQL = """
+        SELECT COUNT(*) AS postings, MAX(job_id) AS max_job_id, MAX(job_posted_date) AS last_posted
+        FROM job_postings_fact """
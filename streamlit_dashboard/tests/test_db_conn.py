@@ -0,0 +1,53 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+import db_conn
+from db_conn import DeadlinePool
+
+
+def test_pool_checkout_waits_only_for_the_remaining_budget():
+    pool = DeadlinePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=30)
+    held = pool.connect()
+    db_conn._deadline.expires = time.monotonic() + 0.1
+    try:
+        start = time.monotonic()
+        with pytest.raises(PoolTimeout):
+            pool.connect()
+        assert time.monotonic() - start < 1
+    finally:
+        db_conn._deadline.expires = None
+        held.close()
+
+
+def test_pool_checkout_uses_pool_timeout_outside_queries():
+    pool = DeadlinePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=30)
+    assert pool._timeout == 30
+
+
+def test_connect_timeout_is_capped_by_the_remaining_budget():
+    cparams = {"connect_timeout": db_conn.CONNECT_TIMEOUT_S}
+    db_conn._deadline.expires = time.monotonic() + 2.5
+    try:
+        db_conn._cap_connect_timeout(None, None, [], cparams)
+    finally:
+        db_conn._deadline.expires = None
+    assert cparams["connect_timeout"] == 3
+
+    # Never 0, which libpq reads as "wait forever"
+    db_conn._deadline.expires = time.monotonic() - 1
+    try:
+        db_conn._cap_connect_timeout(None, None, [], cparams)
+    finally:
+        db_conn._deadline.expires = None
+    assert cparams["connect_timeout"] == 2
+
+
+def test_query_key_tells_schemas_apart():
+    sql = "SELECT 1"
+    assert db_conn.query_key(sql) == db_conn.query_key(sql, {}) == (sql, None)
+    assert db_conn.query_key(sql, {"a": "int64", "b": "float32"}) == db_conn.query_key(sql, {"b": "float32", "a": "int64"})
+    assert db_conn.query_key(sql, {"a": "int64"}) != db_conn.query_key(sql, {"a": "float32"})
+    assert hash(db_conn.query_key(sql, {"a": "int64"}))
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import pytest
+
+from governor import FairSemaphore, QueryGovernor, QueryTimeout
+
+
+def wait_until(predicate, timeout=2.0):
+    expires = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < expires, "condition not reached in time"
+        time.sleep(0.001)
+
+
+def test_semaphore_grants_permits_in_arrival_order():
+    sem = FairSemaphore(1)
+    assert sem.acquire(timeout=0)
+    order = []
+
+    def worker(i):
+        assert sem.acquire(timeout=2)
+        order.append(i)
+        sem.release()
+
+    threads = []
+    for i in range(5):
+        threads.append(threading.Thread(target=worker, args=(i,)))
+        threads[-1].start()
+        # Queue each waiter before the next one arrives
+        wait_until(lambda: len(sem._waiters) == i + 1)
+
+    sem.release()
+    for t in threads:
+        t.join()
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_semaphore_hands_permit_to_waiter_instead_of_newcomer():
+    sem = FairSemaphore(1)
+    assert sem.acquire(timeout=0)
+    got = threading.Event()
+    waiter = threading.Thread(target=lambda: sem.acquire(timeout=2) and got.set())
+    waiter.start()
+    wait_until(lambda: len(sem._waiters) == 1)
+
+    sem.release()
+    # The permit went straight to the queued thread, so a newcomer can't barge in
+    assert not sem.acquire(timeout=0)
+    waiter.join()
+    assert got.is_set()
+
+
+def test_semaphore_timeout_leaves_queue_and_count_intact():
+    sem = FairSemaphore(1)
+    assert sem.acquire(timeout=0)
+    assert not sem.acquire(timeout=0.05)
+    assert not sem._waiters
+
+    sem.release()
+    assert sem.acquire(timeout=0)
+
+
+def test_single_flight_runs_identical_queries_once():
+    governor = QueryGovernor(max_concurrent=4, deadline=5)
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    def query(timeout_ms):
+        calls.append(timeout_ms)
+        started.set()
+        release.wait(2)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(governor.run("k", query))) for _ in range(5)]
+    threads[0].start()
+    started.wait(2)
+    for t in threads[1:]:
+        t.start()
+    # Followers are waiting on the leader's future, not on the database
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert governor.last_good("k") == "result"
+
+
+def test_single_flight_shares_the_leaders_error_and_retries_afterwards():
+    governor = QueryGovernor(deadline=5)
+    started, release = threading.Event(), threading.Event()
+
+    def failing(timeout_ms):
+        started.set()
+        release.wait(2)
+        raise ValueError("boom")
+
+    errors = []
+
+    def run():
+        try:
+            governor.run("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    started.wait(2)
+    follower = threading.Thread(target=run)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert governor.last_good("k") is None
+    # Nothing is left in flight, so the next call runs the query again
+    assert governor.run("k", lambda timeout_ms: "ok") == "ok"
+
+
+def test_follower_gives_up_at_its_own_deadline():
+    governor = QueryGovernor(deadline=5)
+    started, release = threading.Event(), threading.Event()
+
+    def slow(timeout_ms):
+        started.set()
+        release.wait(2)
+        return "late"
+
+    leader = threading.Thread(target=lambda: governor.run("k", slow))
+    leader.start()
+    started.wait(2)
+    try:
+        with pytest.raises(QueryTimeout):
+            governor.run("k", slow, deadline=0.05)
+    finally:
+        release.set()
+        leader.join()
+
+
+def test_queries_past_the_concurrency_cap_time_out_waiting_for_admission():
+    governor = QueryGovernor(max_concurrent=1, deadline=5)
+    started, release = threading.Event(), threading.Event()
+
+    def slow(timeout_ms):
+        started.set()
+        release.wait(2)
+
+    busy = threading.Thread(target=lambda: governor.run("a", slow))
+    busy.start()
+    started.wait(2)
+    ran = []
+    try:
+        with pytest.raises(QueryTimeout):
+            governor.run("b", ran.append, deadline=0.05)
+    finally:
+        release.set()
+        busy.join()
+    assert not ran
+
+
+def test_query_gets_the_remaining_budget_as_timeout():
+    governor = QueryGovernor(deadline=2)
+    timeout_ms = governor.run("k", lambda ms: ms)
+    assert 1500 < timeout_ms <= 2000
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from leaderboard import CompanyLeaderboard
+
+
+def rows(*records):
+    columns = ["company", "job_title_short", "job_work_from_home", "job_country", "max_job_id",
+               "year_count", "year_sum", "hour_count", "hour_sum"]
+    return pd.DataFrame(records, columns=columns)
+
+
+def test_null_title_counts_once_in_all_slice():
+    board = CompanyLeaderboard(min_postings=1)
+    board.add(rows(("Acme", None, False, "Germany", 1, 1, 100000.0, 0, 0.0)))
+
+    top = board.top_k("salary_year_avg", min_postings=1)
+    assert top["postings"].tolist() == [1]
+    assert board.top_k("salary_year_avg", country="Germany")["postings"].tolist() == [1]
+
+
+def test_single_outlier_is_outranked_by_a_steady_payer():
+    board = CompanyLeaderboard(min_postings=1, prior_weight=10)
+    board.add(rows(
+        ("Outlier", "Data Analyst", False, "US", 1, 1, 300000.0, 0, 0.0),
+        ("Steady", "Data Analyst", False, "US", 2, 40, 40 * 160000.0, 0, 0.0),
+        ("Average", "Data Analyst", False, "US", 3, 40, 40 * 90000.0, 0, 0.0),
+    ))
+
+    top = board.top_k("salary_year_avg", "Data Analyst", min_postings=1)
+    assert top["company"].tolist() == ["Steady", "Outlier", "Average"]
+    assert top["score"].is_monotonic_decreasing
+    assert board.last_job_id == 3
+
+
+def test_min_postings_filters_small_companies():
+    board = CompanyLeaderboard()
+    board.add(rows(("Tiny", "Data Analyst", True, "US", 1, 2, 300000.0, 0, 0.0)))
+    assert board.top_k("salary_year_avg", min_postings=5).empty
+    assert len(board.top_k("salary_year_avg", location_filter="Remote Only", min_postings=2)) == 1
+
+
+def test_failed_refresh_backs_off_instead_of_retrying_every_call():
+    board = CompanyLeaderboard()
+    calls = []
+
+    def failing(sql, schema):
+        calls.append(sql)
+        raise ConnectionError("down")
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            board.refresh(failing, min_interval=0, retry_after=60)
+    assert len(calls) == 1
+
+    # Once the back-off has passed the next call queries again
+    board._retry_at = 0.0
+    board.refresh(lambda sql, schema: rows(("Acme", "Data Analyst", False, "US", 7, 1, 1.0, 0, 0.0)), min_interval=0)
+    assert board.last_job_id == 7
+
+
+def test_new_data_version_forces_a_refresh():
+    board = CompanyLeaderboard()
+    fetched = []
+
+    def fetch(sql, schema):
+        fetched.append(sql)
+        return rows(("Acme", "Data Analyst", False, "US", len(fetched), 1, 1.0, 0, 0.0))
+
+    board.refresh(fetch, min_interval=600, version="v1")
+    board.refresh(fetch, min_interval=600, version="v1")
+    assert len(fetched) == 1 and board.version == "v1"
+    board.refresh(fetch, min_interval=600, version="v2")
+    assert len(fetched) == 2 and board.version == "v2"
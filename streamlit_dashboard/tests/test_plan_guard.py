@@ -0,0 +1,168 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+import queries as q
+import plan_guard
+
+
+class FakeResult(list):
+    def one(self):
+        return self[0]
+
+
+class FakeConn:
+    """ Answers the two lookups template_cases makes"""
+
+    def __init__(self, countries):
+        self.countries = countries
+
+    def execute(self, statement):
+        if str(statement) == q.COUNTRIES_SQL:
+            return FakeResult((country,) for country in self.countries)
+        return FakeResult([(datetime.date(2023, 1, 2), datetime.date(2023, 12, 31))])
+
+
+def stored(cases):
+    """ Plans as capture writes them, minus the EXPLAIN numbers"""
+    plans = {name: {"template": template, "filters": filters, "sql": sql} for name, template, filters, sql in cases}
+    return json.loads(json.dumps(plans))
+
+
+def test_replay_rebuilds_the_captured_sql_even_when_the_data_changes():
+    captured = plan_guard.template_cases(FakeConn(["Germany", "India", "United States"]), 6, 7)
+    # A new country reshuffles the sample that capture would pick today
+    resampled = plan_guard.template_cases(FakeConn(["Canada", "Germany", "India", "United States"]), 6, 7)
+    assert {c[0] for c in captured} != {c[0] for c in resampled}
+
+    cases, missing = plan_guard.replay_cases(stored(captured), {})
+    assert not missing
+    assert sorted((name, sql) for name, _, _, sql in cases) == sorted((c[0], c[3]) for c in captured)
+
+
+def test_cases_that_cannot_be_rebuilt_are_missing():
+    plans = stored(plan_guard.project_cases()[:1] + plan_guard.template_cases(FakeConn(["Germany"]), 1, 7)[:5])
+    project_name = next(iter(plans))
+    plans["gone_template[x]"] = {"template": "gone_template", "filters": {}, "sql": "SELECT 1"}
+    plans["old_format"] = {"sql_hash": "abc"}
+    plans["leaderboard[full]"]["filters"] = {}
+
+    cases, missing = plan_guard.replay_cases(plans, {})
+    assert sorted(missing) == sorted([project_name, "gone_template[x]", "old_format", "leaderboard[full]"])
+    assert len(cases) == 4
+
+
+def test_check_fails_on_missing_cases_unless_allowed(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "plan_baselines.json"
+    path.write_text(json.dumps({"server_version": "16", "plans": {"gone": {"template": "gone", "filters": {}}}}))
+    monkeypatch.setattr(plan_guard, "sampled_cases", lambda engine, args, samples, seed: ("16", []))
+    args = SimpleNamespace(baselines=path, case=None, samples=4, seed=7, timeout=1, allow_missing=False)
+
+    assert plan_guard.check(None, args) == 1
+    assert "MISSING: gone" in capsys.readouterr().out
+    args.allow_missing = True
+    assert plan_guard.check(None, args) == 0
+
+
+def guard_args(**overrides):
+    args = dict(cost_ratio=1.5, min_cost=100, buffer_ratio=1.5, min_buffers=128, strict_shape=False)
+    args.update(overrides)
+    return SimpleNamespace(**args)
+
+
+def scan(relation, node_type="Seq Scan", **extra):
+    return {"Node Type": node_type, "Relation Name": relation, **extra}
+
+
+def explain(plan, cost=1000.0, hit=500, read=0, temp=0, ms=12.345):
+    """ Canned EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) result around `plan`"""
+    root = {**plan, "Total Cost": cost, "Plan Rows": 10, "Shared Hit Blocks": hit,
+            "Shared Read Blocks": read, "Temp Written Blocks": temp}
+    return {"Plan": root, "Execution Time": ms}
+
+
+HASH_JOIN = {"Node Type": "Hash Join", "Join Type": "Inner", "Plans": [
+    scan("job_postings_fact", "Index Scan", **{"Index Name": "idx_job_postings_fact_title"}),
+    {"Node Type": "Hash", "Plans": [scan("skills_job_dim", "Index Only Scan", **{"Index Name": "skills_job_dim_pkey"})]},
+]}
+
+
+def test_normalize_reduces_a_plan_to_shape_and_numbers():
+    plan = plan_guard.normalize(explain(HASH_JOIN, cost=1234.5, hit=300, read=200, temp=7), "SELECT 1")
+    assert plan["total_cost"] == 1234.5
+    assert plan["buffers"] == 500 and plan["buffers_read"] == 200
+    assert plan["temp_written"] == 7
+    assert plan["execution_ms"] == 12.35
+    assert plan["sql"] == "SELECT 1" and len(plan["sql_hash"]) == 12
+    assert plan["shape"] == [
+        "Hash Join (Inner)",
+        "  Index Scan using idx_job_postings_fact_title on job_postings_fact",
+        "  Hash",
+        "    Index Only Scan using skills_job_dim_pkey on skills_job_dim",
+    ]
+
+
+def test_node_label_marks_parallel_strategy_and_disk():
+    assert plan_guard.node_label({"Node Type": "Aggregate", "Strategy": "Hashed", "Parallel Aware": True}) \
+        == "Parallel Aggregate [Hashed]"
+    assert plan_guard.node_label({"Node Type": "Sort", "Sort Space Type": "Disk"}) == "Sort [disk]"
+    assert plan_guard.node_label({"Node Type": "HashAggregate", "Disk Usage": 1024}) == "HashAggregate [disk]"
+    assert plan_guard.node_label({"Node Type": "Hash", "Hash Batches": 4}) == "Hash [disk]"
+    assert plan_guard.node_label({"Node Type": "Sort", "Sort Space Type": "Memory", "Hash Batches": 1}) == "Sort"
+
+
+def test_cost_and_buffer_growth_fail_past_ratio_and_floor():
+    base = plan_guard.normalize(explain(HASH_JOIN, cost=1000, hit=1000), "q")
+    args = guard_args()
+
+    assert plan_guard.compare(base, plan_guard.normalize(explain(HASH_JOIN, cost=1600, hit=1000), "q"), args) \
+        == ["total cost 1,000 -> 1,600 (1.6x > 1.5x)"]
+    assert plan_guard.compare(base, plan_guard.normalize(explain(HASH_JOIN, cost=1000, hit=1400, read=200), "q"), args) \
+        == ["buffers touched 1,000 -> 1,600 (1.6x > 1.5x)"]
+    # Below the ratio
+    assert not plan_guard.compare(base, plan_guard.normalize(explain(HASH_JOIN, cost=1400, hit=1400), "q"), args)
+
+
+def test_small_absolute_growth_stays_under_the_floors():
+    base = plan_guard.normalize(explain(HASH_JOIN, cost=10, hit=10), "q")
+    # 9x the cost and 10x the buffers, but only +80 cost and +90 blocks
+    current = plan_guard.normalize(explain(HASH_JOIN, cost=90, hit=100), "q")
+    assert not plan_guard.compare(base, current, guard_args())
+    assert len(plan_guard.compare(base, current, guard_args(min_cost=50, min_buffers=50))) == 2
+
+
+def test_new_temp_writes_fail_but_existing_ones_do_not():
+    base = plan_guard.normalize(explain(HASH_JOIN), "q")
+    spilling = plan_guard.normalize(explain(HASH_JOIN, temp=64), "q")
+    assert plan_guard.compare(base, spilling, guard_args()) == ["now writes 64 temp blocks"]
+    assert not plan_guard.compare(spilling, plan_guard.normalize(explain(HASH_JOIN, temp=128), "q"), guard_args())
+
+
+def test_added_suspect_nodes_fail_and_harmless_shape_changes_only_with_strict_shape():
+    base = plan_guard.normalize(explain(HASH_JOIN), "q")
+    nested = {"Node Type": "Nested Loop", "Join Type": "Inner", "Plans": [
+        scan("job_postings_fact"),
+        {"Node Type": "Materialize", "Plans": [scan("skills_job_dim", "Index Only Scan", **{"Index Name": "skills_job_dim_pkey"})]},
+    ]}
+    assert plan_guard.compare(base, plan_guard.normalize(explain(nested), "q"), guard_args()) == [
+        "plan gained Materialize, Nested Loop (Inner), Seq Scan on job_postings_fact"]
+
+    spilled = {**HASH_JOIN, "Plans": [HASH_JOIN["Plans"][0], {**HASH_JOIN["Plans"][1], "Hash Batches": 8}]}
+    assert plan_guard.compare(base, plan_guard.normalize(explain(spilled), "q"), guard_args()) == ["plan gained Hash [disk]"]
+
+    # Swapping one index for another is neither suspect nor a cost regression
+    other_index = {**HASH_JOIN, "Plans": [
+        scan("job_postings_fact", "Index Scan", **{"Index Name": "idx_job_postings_fact_country"}), HASH_JOIN["Plans"][1]]}
+    current = plan_guard.normalize(explain(other_index), "q")
+    assert not plan_guard.compare(base, current, guard_args())
+    assert plan_guard.compare(base, current, guard_args(strict_shape=True)) == ["plan shape changed"]
+
+
+def test_shape_diff_shows_the_changed_nodes():
+    base = plan_guard.normalize(explain(HASH_JOIN), "q")
+    current = plan_guard.normalize(explain({**HASH_JOIN, "Plans": [scan("job_postings_fact"), HASH_JOIN["Plans"][1]]}), "q")
+    diff = plan_guard.shape_diff(base, current).splitlines()
+    assert diff[:2] == ["--- baseline", "+++ current"]
+    assert "-  Index Scan using idx_job_postings_fact_title on job_postings_fact" in diff
+    assert "+  Seq Scan on job_postings_fact" in diff
+    assert plan_guard.shape_diff(base, base) == ""